@@ -0,0 +1,184 @@
+"""Streaming anomaly scoring for debits (withdrawals, transfers out, recurring debits).
+
+Each account keeps a constant-size state in the cache named by
+``ANOMALY_CACHE``: an EWMA mean and variance of debit amounts plus a
+sliding-window debit count.  Entries are scored after their transaction
+commits, so scoring never holds database locks on the money path.  A debit is
+flagged when its amount is ``Z_THRESHOLD`` standard deviations above the EWMA
+mean, or when the hourly debit count exceeds ``BURST_LIMIT``.
+Only flagged entries touch the database (one ``AnomalyFlag`` row).
+
+``backfill`` rebuilds the same state from historical rows with pandas, so
+the scorer can be switched on against an existing ledger.
+"""
+import logging
+import math
+import threading
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction as db_transaction
+
+from .models import Account, AnomalyFlag, Transaction
+from .reconciliation import account_id_ranges
+
+logger = logging.getLogger(__name__)
+
+ALPHA = 0.1
+MIN_HISTORY = 5
+Z_THRESHOLD = 4.0
+BURST_WINDOW_SECONDS = 3600
+BURST_LIMIT = 10
+
+DEBIT_TYPES = frozenset(t for t, sign in Transaction.BALANCE_EFFECT.items() if sign < 0)
+
+_lock = threading.Lock()
+
+
+class State(NamedTuple):
+    mean: float
+    var: float
+    count: int
+    window: int          # index of the current burst window (timestamp // BURST_WINDOW_SECONDS)
+    window_count: int
+    prev_window_count: int
+
+
+def _cache():
+    return caches[getattr(settings, "ANOMALY_CACHE", "default")]
+
+
+def _key(account_id) -> str:
+    return f"anomaly:{account_id}"
+
+
+def step(state, amount: float, ts: float):
+    """Fold one debit into ``state``; return (new state, z-score, windowed debit rate)."""
+    window = int(ts // BURST_WINDOW_SECONDS)
+    if state is None:
+        return State(amount, 0.0, 1, window, 1, 0), 0.0, 1.0
+    z = (amount - state.mean) / math.sqrt(state.var) if state.var > 0 else 0.0
+    if window == state.window:
+        window_count, prev = state.window_count + 1, state.prev_window_count
+    else:
+        window_count, prev = 1, state.window_count if window == state.window + 1 else 0
+    # Sliding-window estimate: previous window weighted by its overlap with the last hour.
+    overlap = 1 - (ts % BURST_WINDOW_SECONDS) / BURST_WINDOW_SECONDS
+    rate = window_count + prev * overlap
+    d = amount - state.mean
+    mean = state.mean + ALPHA * d
+    var = (1 - ALPHA) * (state.var + ALPHA * d * d)
+    return State(mean, var, state.count + 1, window, window_count, prev), z, rate
+
+
+def observe(entry: Transaction) -> list:
+    """Score one committed ledger entry; returns the reasons it was flagged (usually [])."""
+    if entry.tx_type not in DEBIT_TYPES:
+        return []
+    cache = _cache()
+    key = _key(entry.account_id)
+    with _lock:
+        raw = cache.get(key)
+        state, z, rate = step(State(*raw) if raw is not None else None, float(entry.amount),
+                              entry.timestamp.timestamp())
+        cache.set(key, tuple(state), None)
+    reasons = []
+    if state.count > MIN_HISTORY and z > Z_THRESHOLD:
+        reasons.append("amount_spike")
+    if rate > BURST_LIMIT:
+        reasons.append("burst")
+    if reasons:
+        AnomalyFlag.objects.create(account_id=entry.account_id, transaction_id=entry.pk,
+                                   score=z, reasons=",".join(reasons))
+        logger.warning("Anomalous debit %s on account %s: %s", entry.pk, entry.account_id, reasons)
+    return reasons
+
+
+def schedule(entries) -> None:
+    """Score ``entries`` once the surrounding transaction commits."""
+    if not getattr(settings, "ANOMALY_ENABLED", True):
+        return
+    entries = [e for e in entries if e.tx_type in DEBIT_TYPES]
+    if entries:
+        # robust: a scoring failure is logged, never raised into the caller's money path.
+        db_transaction.on_commit(lambda: [observe(e) for e in entries], robust=True)
+
+
+def get_state(account_id):
+    raw = _cache().get(_key(account_id))
+    return State(*raw) if raw is not None else None
+
+
+def backfill(queryset=None, accounts_per_chunk: int = 10000) -> int:
+    """Rebuild per-account state from historical debits, vectorised with pandas.
+
+    Produces the same state as replaying every debit through ``observe``.
+    Accounts are processed in id ranges to bound memory.  Returns the number
+    of accounts written.  Raises ``ImproperlyConfigured`` if ``ANOMALY_CACHE``
+    cannot hold every account's state, rather than letting it evict silently.
+    """
+    queryset = queryset if queryset is not None else Transaction.objects.all()
+    cache = _cache()
+    # Only these backends cull at MAX_ENTRIES; memcached/redis evict on memory
+    # pressure instead, which the per-chunk read-back below detects.
+    culls = isinstance(cache, (LocMemCache, FileBasedCache, DatabaseCache))
+    accounts = Account.objects.count()
+    if culls and accounts > cache._max_entries:
+        raise ImproperlyConfigured(
+            f"ANOMALY_CACHE holds at most {cache._max_entries} entries but there are {accounts} accounts; "
+            "raise its MAX_ENTRIES or use a larger shared cache."
+        )
+    written = 0
+    for bounds in account_id_ranges(accounts_per_chunk):
+        chunk = queryset.filter(account_id__gte=bounds["gte"], account_id__lt=bounds["lt"])
+        written += _backfill_chunk(chunk)
+    return written
+
+
+def _ewm_by_account(df, column):
+    ewm = df.groupby("account_id", sort=False)[column].ewm(alpha=ALPHA, adjust=False).mean()
+    return ewm.reset_index(level=0, drop=True)
+
+
+def _backfill_chunk(queryset) -> int:
+    rows = (queryset.filter(tx_type__in=DEBIT_TYPES).order_by("account_id", "timestamp", "id")
+            .values_list("account_id", "amount", "timestamp").iterator(chunk_size=5000))
+    df = pd.DataFrame.from_records(rows, columns=["account_id", "amount", "timestamp"])
+    if df.empty:
+        return 0
+    df["amount"] = df["amount"].astype(float)
+    ts = (pd.to_datetime(df["timestamp"], utc=True) - pd.Timestamp("1970-01-01", tz="UTC")).dt.total_seconds()
+    df["window"] = (ts // BURST_WINDOW_SECONDS).astype(np.int64)
+
+    # Same recurrences as step(): var_t = (1 - a) * var_{t-1} + a * y_t with y_t = (1 - a) * d_t ** 2.
+    df["mean"] = _ewm_by_account(df, "amount")
+    prev_mean = df.groupby("account_id", sort=False)["mean"].shift(1).fillna(df["amount"])
+    df["y"] = (1 - ALPHA) * (df["amount"] - prev_mean) ** 2
+    df["var"] = _ewm_by_account(df, "y")
+
+    last = df.groupby("account_id", sort=False).tail(1).set_index("account_id")
+    counts = df.groupby("account_id", sort=False).size()
+    per_window = df.groupby(["account_id", "window"]).size()
+
+    states = {}
+    for account_id, mean, var, window in zip(last.index, last["mean"], last["var"], last["window"]):
+        window = int(window)
+        states[_key(account_id)] = tuple(State(
+            float(mean), float(var), int(counts[account_id]), window,
+            int(per_window.get((account_id, window), 0)), int(per_window.get((account_id, window - 1), 0)),
+        ))
+    cache = _cache()
+    failed = cache.set_many(states, None)
+    kept = len(cache.get_many(list(states)))
+    if failed or kept < len(states):
+        raise ImproperlyConfigured(
+            f"ANOMALY_CACHE kept only {kept} of {len(states)} account states; it is too small for backfill."
+        )
+    return len(states)
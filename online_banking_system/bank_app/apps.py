@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class BankAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bank_app"
+
+    def ready(self):
+        from . import signals  # noqa: F401
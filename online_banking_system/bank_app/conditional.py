@@ -0,0 +1,45 @@
+"""Conditional GET support for tool pages that render the same HTML until the user submits input."""
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.views.decorators.http import condition
+
+
+def _template_mtime(template_name: str) -> float:
+    template = get_template(template_name).template
+    paths = [template.origin.name, get_template("bank_app/base.html").template.origin.name]
+    return max(os.path.getmtime(p) for p in paths)
+
+
+_cached_template_mtime = lru_cache(maxsize=None)(_template_mtime)
+
+
+def static_page(template_name: str):
+    """ETag/Last-Modified for a page whose only per-user content is the navbar.
+
+    Requests carrying query parameters are computed results and bypass the
+    validators entirely.
+    """
+    def _mtime():
+        return _template_mtime(template_name) if settings.DEBUG else _cached_template_mtime(template_name)
+
+    def _last_modified(request, *args, **kwargs):
+        if request.GET:
+            return None
+        modified = datetime.fromtimestamp(_mtime(), tz=timezone.utc)
+        # A newer login (possibly as another user) must invalidate the browser's copy.
+        last_login = getattr(request.user, "last_login", None)
+        return max(modified, last_login) if last_login else modified
+
+    def _etag(request, *args, **kwargs):
+        if request.GET:
+            return None
+        user = request.user
+        raw = f"{template_name}:{_mtime()}:{user.pk}:{user.get_username()}"
+        return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+    return condition(etag_func=_etag, last_modified_func=_last_modified)
@@ -19,9 +19,16 @@ class RegisterForm(forms.ModelForm):
 
 class DepositForm(forms.Form):
     amount = forms.DecimalField(max_digits=12, decimal_places=2, min_value=0.01)
+    idempotency_key = forms.CharField(max_length=64, required=False, widget=forms.HiddenInput)
 
 class WithdrawForm(forms.Form):
     amount = forms.DecimalField(max_digits=12, decimal_places=2, min_value=0.01)
+    idempotency_key = forms.CharField(max_length=64, required=False, widget=forms.HiddenInput)
+
+class TransferForm(forms.Form):
+    recipient = forms.CharField(max_length=150, help_text="Username of the receiving account holder")
+    amount = forms.DecimalField(max_digits=12, decimal_places=2, min_value=0.01)
+    idempotency_key = forms.CharField(max_length=64, required=False, widget=forms.HiddenInput)
 
 # Tool forms:
 class SIPForm(forms.Form):
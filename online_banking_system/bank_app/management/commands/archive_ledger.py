@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bank_app.partitions import archive_period, closed_periods
+
+
+class Command(BaseCommand):
+    help = "Move closed months of Transaction rows older than --keep-days into per-month archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-days", type=int, default=90,
+                            help="Months ending within this many days stay in the hot table (default 90).")
+        parser.add_argument("--dry-run", action="store_true", help="List the months that would be archived.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["keep_days"])
+        periods = closed_periods(cutoff)
+        if not periods:
+            self.stdout.write("Nothing to archive.")
+            return
+        for period in periods:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {period:%Y-%m}")
+                continue
+            partition = archive_period(period)
+            self.stdout.write(f"Archived {period:%Y-%m} into {partition.table_name} ({partition.row_count} rows)")
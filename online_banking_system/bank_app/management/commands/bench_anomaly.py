@@ -0,0 +1,45 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from bank_app.models import Account
+
+
+class Command(BaseCommand):
+    help = "Measure the latency anomaly scoring adds to Account.withdraw (target: < 1 ms per write)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writes", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            writes = options["writes"]
+            timings = {}
+            for enabled in (False, True):
+                with override_settings(ANOMALY_ENABLED=enabled):
+                    caches[settings.ANOMALY_CACHE].clear()
+                    # Five debits per account keeps this on the common (unflagged) path.
+                    accounts = [
+                        Account.objects.create(user=User.objects.create_user(username=f"bench-{enabled}-{i}"),
+                                               balance=Decimal(10))
+                        for i in range(max(1, writes // 5))
+                    ]
+                    start = time.perf_counter()
+                    for i in range(writes):
+                        accounts[i % len(accounts)].withdraw(Decimal("1.00"))
+                    timings[enabled] = (time.perf_counter() - start) * 1000 / writes
+            added = timings[True] - timings[False]
+            self.stdout.write(f"withdraw without scoring: {timings[False]:.3f} ms")
+            self.stdout.write(f"withdraw with scoring:    {timings[True]:.3f} ms")
+            self.stdout.write(f"added per write:          {added:.3f} ms ({'OK' if added < 1 else 'OVER BUDGET'})")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,72 @@
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from bank_app.models import Account
+
+PROFILES = {
+    "default": {"SESSION_ENGINE": "django.contrib.sessions.backends.db", "AUTH_USER_CACHE_TIMEOUT": 0},
+    "cached": {"SESSION_ENGINE": "django.contrib.sessions.backends.cached_db", "AUTH_USER_CACHE_TIMEOUT": 0},
+    "cookie": {"SESSION_ENGINE": "django.contrib.sessions.backends.signed_cookies", "AUTH_USER_CACHE_TIMEOUT": 0},
+    # User lookups cached in a shared (file) cache, as a multi-worker deployment would need.
+    "cookie+user": {"SESSION_ENGINE": "django.contrib.sessions.backends.signed_cookies", "AUTH_USER_CACHE_TIMEOUT": 300,
+                    "AUTH_USER_CACHE": "users"},
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark login throughput and DB queries per authenticated request for each auth profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Authenticated dashboard requests per profile.")
+        parser.add_argument("--logins", type=int, default=10, help="Logins per profile.")
+        parser.add_argument("--iterations", type=int, default=None,
+                            help="PBKDF2 iterations for the login benchmark (default: PASSWORD_PBKDF2_ITERATIONS).")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        user_cache_dir = tempfile.TemporaryDirectory()
+        caches_setting = {**settings.CACHES, "users": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": user_cache_dir.name}}
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.stdout.write(f"{'profile':<12}{'logins/s':>10}{'queries/req':>14}{'ms/req':>10}")
+            for name, overrides in PROFILES.items():
+                extra = {"THROTTLE_ENABLED": False}
+                if options["iterations"]:
+                    extra["PASSWORD_PBKDF2_ITERATIONS"] = options["iterations"]
+                with override_settings(CACHES=caches_setting, **overrides, **extra):
+                    caches["default"].clear()
+                    logins_per_s, queries, ms = self._run(name, options["logins"], options["requests"])
+                self.stdout.write(f"{name:<12}{logins_per_s:>10.1f}{queries:>14.2f}{ms:>10.2f}")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            user_cache_dir.cleanup()
+
+    def _run(self, name, logins, requests):
+        username, password = f"bench-{name}", "bench-password-123"
+        user = User.objects.create_user(username=username, password=password)
+        Account.objects.create(user=user)
+
+        start = time.perf_counter()
+        for _ in range(logins):
+            client = Client()
+            client.post(reverse("login"), {"username": username, "password": password})
+        logins_per_s = logins / (time.perf_counter() - start)
+
+        client.get(reverse("dashboard"))  # warm session and user caches
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get(reverse("dashboard"))
+            elapsed = time.perf_counter() - start
+        return logins_per_s, len(ctx.captured_queries) / requests, elapsed * 1000 / requests
@@ -0,0 +1,54 @@
+import copy
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+TEMPLATE_DIR = Path(__file__).resolve().parents[2] / "templates" / "bank_app"
+BASE_LOADERS = ["django.template.loaders.filesystem.Loader", "django.template.loaders.app_directories.Loader"]
+
+
+def _templates_setting(loaders):
+    """settings.TEMPLATES as production runs it (debug off) with the given loaders."""
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]["OPTIONS"].update(loaders=loaders, debug=False)
+    return templates
+
+
+CONFIGS = {
+    "uncached": BASE_LOADERS,
+    "cached": [("django.template.loaders.cached.Loader", BASE_LOADERS)],
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark warm render time of every bank_app template with and without the cached loader."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--renders", type=int, default=200, help="Renders per template.")
+
+    def handle(self, *args, **options):
+        renders = options["renders"]
+        request = RequestFactory().get("/")
+        request.user = User(pk=1, username="bench")
+        names = [f"bank_app/{path.name}" for path in sorted(TEMPLATE_DIR.glob("*.html"))]
+        results = {}
+        for config, loaders in CONFIGS.items():
+            # Overriding TEMPLATES rebuilds the template engine, so each run starts cold.
+            with override_settings(TEMPLATES=_templates_setting(loaders)):
+                for name in names:
+                    caches["default"].clear()
+                    render_to_string(name, {}, request=request)
+                    start = time.perf_counter()
+                    for _ in range(renders):
+                        render_to_string(name, {}, request=request)
+                    results[name, config] = (time.perf_counter() - start) * 1000 / renders
+        self.stdout.write(f"{'template':<40}" + "".join(f"{c + ' ms':>14}" for c in CONFIGS))
+        for name in names:
+            self.stdout.write(f"{name:<40}" + "".join(f"{results[name, c]:>14.3f}" for c in CONFIGS))
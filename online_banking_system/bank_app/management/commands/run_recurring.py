@@ -0,0 +1,33 @@
+import os
+import socket
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bank_app.scheduler import claim_due, execute_claimed
+
+
+class Command(BaseCommand):
+    help = "Execute due SIP/RD standing instructions in claimed, atomic chunks. Safe to run in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Instructions per claim and batch.")
+        parser.add_argument("--lease-seconds", type=int, default=600,
+                            help="How long a claim is held before other workers may take it over.")
+        parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}")
+        parser.add_argument("--date", type=date.fromisoformat, default=None,
+                            help="Run as of this date (YYYY-MM-DD); defaults to today.")
+
+    def handle(self, *args, **options):
+        today = options["date"] or timezone.localdate()
+        lease = timedelta(seconds=options["lease_seconds"])
+        executed = failed = 0
+        while True:
+            ids = claim_due(options["worker_id"], today, options["chunk_size"], lease)
+            if not ids:
+                break
+            result = execute_claimed(options["worker_id"], ids, today)
+            executed += result["executed"]
+            failed += result["failed"]
+        self.stdout.write(f"Executed {executed} instructions, {failed} failed for insufficient balance.")
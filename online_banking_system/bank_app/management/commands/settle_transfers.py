@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from bank_app.transfers import settle_pending_transfers
+
+
+class Command(BaseCommand):
+    help = "Settle queued transfers in netted batches until none are pending."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000, help="Pending transfers per atomic batch.")
+
+    def handle(self, *args, **options):
+        totals = {"settled": 0, "failed": 0, "entries": 0}
+        while True:
+            result = settle_pending_transfers(options["batch_size"])
+            if not result["settled"] and not result["failed"]:
+                break
+            for key in totals:
+                totals[key] += result[key]
+        self.stdout.write(
+            f"Settled {totals['settled']} transfers ({totals['failed']} failed) "
+            f"with {totals['entries']} ledger entries."
+        )
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+# Caches private to one process: an eviction there never reaches the other workers.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def user_cache():
+    return caches[getattr(settings, "AUTH_USER_CACHE", "default")]
+
+
+def check_user_cache() -> None:
+    """Refuse to cache users in a per-process cache, where evictions cannot reach other workers."""
+    if not getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 0):
+        return
+    alias = getattr(settings, "AUTH_USER_CACHE", "default")
+    if settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"AUTH_USER_CACHE_TIMEOUT requires AUTH_USER_CACHE to name a shared cache; {alias!r} is per-process."
+        )
+
+
+def get_cached_user(request):
+    """Like ``auth.get_user`` but served from cache while the session hash still matches."""
+    timeout = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 0)
+    user_id = request.session.get(SESSION_KEY)
+    backend_path = request.session.get(BACKEND_SESSION_KEY)
+    if not timeout or user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    cache = user_cache()
+    user = cache.get(user_cache_key(user_id))
+    if user is not None:
+        session_hash = request.session.get(HASH_SESSION_KEY)
+        if session_hash and constant_time_compare(session_hash, user.get_session_auth_hash()):
+            user.backend = backend_path
+            return user
+    # Cache miss or stale hash: the stock lookup also flushes invalid sessions.
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(user_cache_key(user_id), user, timeout)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Drop-in AuthenticationMiddleware that skips the user query on cache hits.
+
+    Behaves exactly like the stock middleware when ``AUTH_USER_CACHE_TIMEOUT``
+    is 0.  Cached users are evicted by ``bank_app.signals`` whenever the user
+    row is saved or deleted (password change, deactivation, last_login).
+    Writes that bypass ``save()`` (``QuerySet.update``, raw SQL) are not seen
+    until the entry expires: a user deactivated that way keeps access for up
+    to ``AUTH_USER_CACHE_TIMEOUT`` seconds, so keep the timeout short.
+    """
+
+    def __init__(self, get_response):
+        check_user_cache()
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+
+
+def _get_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = get_cached_user(request)
+    return request._cached_user
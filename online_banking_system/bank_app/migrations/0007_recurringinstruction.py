@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_app', '0006_transfers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='tx_type',
+            field=models.CharField(choices=[('DEPOSIT', 'Deposit'), ('WITHDRAWAL', 'Withdrawal'), ('TRANSFER_IN', 'Transfer in'), ('TRANSFER_OUT', 'Transfer out'), ('RECURRING_DEBIT', 'Recurring debit')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='RecurringInstruction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SIP', 'SIP'), ('RD', 'Recurring deposit')], max_length=3)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('day_of_month', models.PositiveSmallIntegerField()),
+                ('next_run_date', models.DateField()),
+                ('installments_total', models.PositiveIntegerField(blank=True, null=True)),
+                ('installments_paid', models.PositiveIntegerField(default=0)),
+                ('active', models.BooleanField(default=True)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, max_length=200)),
+                ('claimed_by', models.CharField(blank=True, max_length=64, null=True)),
+                ('claim_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_instructions', to='bank_app.account')),
+            ],
+            options={
+                'ordering': ['next_run_date', 'id'],
+                'indexes': [models.Index(fields=['active', 'next_run_date'], name='recurring_due_idx')],
+            },
+        ),
+    ]
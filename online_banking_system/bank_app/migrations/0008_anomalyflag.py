@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 04:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_app', '0007_recurringinstruction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_id', models.BigIntegerField()),
+                ('score', models.FloatField()),
+                ('reasons', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_flags', to='bank_app.account')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_app', '0008_anomalyflag'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reconciliationcheckpoint',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
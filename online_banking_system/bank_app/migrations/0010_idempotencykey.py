@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def record_existing_keys(apps, schema_editor):
+    """Copy keys already on ledger rows, hot and archived, into IdempotencyKey."""
+    IdempotencyKey = apps.get_model("bank_app", "IdempotencyKey")
+    Transaction = apps.get_model("bank_app", "Transaction")
+    LedgerPartition = apps.get_model("bank_app", "LedgerPartition")
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    tables = [Transaction._meta.db_table] + list(LedgerPartition.objects.values_list("table_name", flat=True))
+    for table in tables:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {quote('account_id')}, {quote('idempotency_key')}, {quote('id')} FROM {quote(table)} "
+                f"WHERE {quote('idempotency_key')} IS NOT NULL"
+            )
+            rows = cursor.fetchall()
+        IdempotencyKey.objects.bulk_create(
+            [IdempotencyKey(account_id=account_id, key=key, transaction_id=tx_id) for account_id, key, tx_id in rows],
+            batch_size=1000, ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_app', '0009_reconciliationcheckpoint_started_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('transaction_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='bank_app.account')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('account', 'key'), name='unique_idempotency_key'),
+        ),
+        migrations.RunPython(record_existing_keys, migrations.RunPython.noop),
+    ]
@@ -1,43 +1,249 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction as db_transaction
 from decimal import Decimal
 
+
+def lock_accounts(*account_ids) -> dict:
+    """SELECT ... FOR UPDATE the given accounts in ascending id order.
+
+    Every writer locks in the same order, so two transfers between the same
+    accounts in opposite directions wait on each other instead of deadlocking.
+    Must be called inside ``transaction.atomic()``.
+    """
+    accounts = Account.objects.select_for_update().filter(pk__in=set(account_ids)).order_by("pk")
+    return {account.pk: account for account in accounts}
+
+
 class Account(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="account")
     balance = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
 
-    def deposit(self, amount: Decimal) -> None:
+    def deposit(self, amount: Decimal, idempotency_key: str = None) -> "Transaction":
         if amount <= 0:
             raise ValueError("Deposit amount must be positive.")
-        self.balance += amount
-        self.save()
-        Transaction.objects.create(account=self, amount=amount, tx_type=Transaction.DEPOSIT)
+        return self._post(Transaction.DEPOSIT, amount, idempotency_key)
 
-    def withdraw(self, amount: Decimal) -> None:
+    def withdraw(self, amount: Decimal, idempotency_key: str = None) -> "Transaction":
         if amount <= 0:
             raise ValueError("Withdrawal amount must be positive.")
-        if amount > self.balance:
-            raise ValueError("Insufficient balance.")
-        self.balance -= amount
-        self.save()
-        Transaction.objects.create(account=self, amount=amount, tx_type=Transaction.WITHDRAWAL)
+        return self._post(Transaction.WITHDRAWAL, amount, idempotency_key)
+
+    def _post(self, tx_type: str, amount: Decimal, idempotency_key: str = None) -> "Transaction":
+        """Apply one ledger entry, or return the entry already recorded under ``idempotency_key``."""
+        if idempotency_key:
+            original = self._replay(tx_type, amount, idempotency_key)
+            if original is not None:
+                return original
+        try:
+            with db_transaction.atomic():
+                locked = lock_accounts(self.pk)[self.pk]
+                if tx_type == Transaction.WITHDRAWAL and amount > locked.balance:
+                    raise ValueError("Insufficient balance.")
+                locked.balance += amount * Transaction.BALANCE_EFFECT[tx_type]
+                locked.save(update_fields=["balance"])
+                self.balance = locked.balance
+                entry = Transaction.objects.create(account=self, amount=amount, tx_type=tx_type,
+                                                   idempotency_key=idempotency_key or None)
+                if idempotency_key:
+                    IdempotencyKey.objects.create(account=self, key=idempotency_key, transaction_id=entry.pk)
+                return entry
+        except IntegrityError:
+            # A concurrent retry with the same key committed first; ours was rolled back.
+            self.refresh_from_db()
+            original = self._replay(tx_type, amount, idempotency_key) if idempotency_key else None
+            if original is None:
+                raise
+            return original
+
+    def _replay(self, tx_type: str, amount: Decimal, idempotency_key: str):
+        original = IdempotencyKey.recorded_entry(self, idempotency_key)
+        if original is None:
+            return None
+        if original.tx_type != tx_type or original.amount != amount:
+            raise ValueError("Idempotency key was already used for a different request.")
+        return original
 
     def __str__(self):
         return f"Account({self.user.username}): {self.balance}"
 
 
+class TransactionManager(models.Manager):
+    def history(self, start=None, end=None):
+        """Entries in [start, end), newest first, including archived ledger partitions.
+
+        On ``account.transactions`` only that account's entries are returned.
+        """
+        from .partitions import history
+        instance = getattr(self, "instance", None)
+        return history(self.get_queryset(), instance.pk if instance is not None else None, start, end)
+
+
 class Transaction(models.Model):
     DEPOSIT = "DEPOSIT"
     WITHDRAWAL = "WITHDRAWAL"
-    TX_CHOICES = [(DEPOSIT, "Deposit"), (WITHDRAWAL, "Withdrawal")]
+    TRANSFER_IN = "TRANSFER_IN"
+    TRANSFER_OUT = "TRANSFER_OUT"
+    RECURRING_DEBIT = "RECURRING_DEBIT"
+    TX_CHOICES = [
+        (DEPOSIT, "Deposit"),
+        (WITHDRAWAL, "Withdrawal"),
+        (TRANSFER_IN, "Transfer in"),
+        (TRANSFER_OUT, "Transfer out"),
+        (RECURRING_DEBIT, "Recurring debit"),
+    ]
+    # Sign each entry type applies to Account.balance.
+    BALANCE_EFFECT = {DEPOSIT: 1, WITHDRAWAL: -1, TRANSFER_IN: 1, TRANSFER_OUT: -1, RECURRING_DEBIT: -1}
 
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="transactions")
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     tx_type = models.CharField(max_length=20, choices=TX_CHOICES)
     timestamp = models.DateTimeField(auto_now_add=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    # Transfers only: the other account, and a reference shared by the paired entries.
+    counterparty = models.ForeignKey(Account, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    reference = models.UUIDField(null=True, blank=True, db_index=True)
+
+    objects = TransactionManager()
 
     class Meta:
         ordering = ["-timestamp"]
+        constraints = [
+            models.UniqueConstraint(fields=["account", "idempotency_key"], name="unique_account_idempotency_key"),
+        ]
+        indexes = [
+            models.Index(fields=["account", "-timestamp"], name="tx_account_timestamp_idx"),
+            models.Index(fields=["timestamp"], name="tx_timestamp_idx"),
+            models.Index(fields=["amount"], name="tx_amount_idx"),
+        ]
 
     def __str__(self):
         return f"{self.tx_type} {self.amount} on {self.timestamp}"
+
+
+class PendingTransfer(models.Model):
+    """A transfer queued for batch settlement (see ``bank_app.transfers.settle_pending_transfers``)."""
+    PENDING = "PENDING"
+    SETTLED = "SETTLED"
+    FAILED = "FAILED"
+    STATUS_CHOICES = [(PENDING, "Pending"), (SETTLED, "Settled"), (FAILED, "Failed")]
+
+    source = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+")
+    target = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+")
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["status", "id"], name="pending_transfer_status_idx")]
+
+    def __str__(self):
+        return f"{self.source_id} -> {self.target_id}: {self.amount} ({self.status})"
+
+
+class RecurringInstruction(models.Model):
+    """Standing instruction to debit an account monthly into a SIP or RD."""
+    SIP = "SIP"
+    RD = "RD"
+    KIND_CHOICES = [(SIP, "SIP"), (RD, "Recurring deposit")]
+
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="recurring_instructions")
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    day_of_month = models.PositiveSmallIntegerField()
+    next_run_date = models.DateField()
+    installments_total = models.PositiveIntegerField(null=True, blank=True)
+    installments_paid = models.PositiveIntegerField(default=0)
+    active = models.BooleanField(default=True)
+    failures = models.PositiveIntegerField(default=0)
+    last_error = models.CharField(max_length=200, blank=True)
+    # Row claim held by one scheduler worker while it executes the instruction.
+    claimed_by = models.CharField(max_length=64, null=True, blank=True)
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["next_run_date", "id"]
+        indexes = [models.Index(fields=["active", "next_run_date"], name="recurring_due_idx")]
+
+    def __str__(self):
+        return f"{self.kind} {self.amount} on day {self.day_of_month} for account {self.account_id}"
+
+
+class AnomalyFlag(models.Model):
+    """A debit the streaming scorer considered unusual (see ``bank_app.anomaly``)."""
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="anomaly_flags")
+    # Plain id rather than a FK: flagged entries may later move to an archive partition.
+    transaction_id = models.BigIntegerField()
+    score = models.FloatField()
+    reasons = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Account {self.account_id} tx {self.transaction_id}: {self.reasons}"
+
+
+class IdempotencyKey(models.Model):
+    """The ledger entry first posted under an account's idempotency key.
+
+    Kept apart from Transaction because ledger rows move to archive
+    partitions; this table never does, so a retry is recognised however old
+    the original entry is.
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=64)
+    # Not a foreign key: the entry may since have moved to an archive table.
+    transaction_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "key"], name="unique_idempotency_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id}:{self.key} -> tx {self.transaction_id}"
+
+    @classmethod
+    def recorded_entry(cls, account, key):
+        """The Transaction recorded under ``key`` for ``account`` (hot or archived), or None."""
+        from .partitions import find_entry
+        transaction_id = cls.objects.filter(account=account, key=key).values_list("transaction_id", flat=True).first()
+        return find_entry(pk=transaction_id) if transaction_id is not None else None
+
+
+class LedgerPartition(models.Model):
+    """A closed month of Transaction rows moved to its own archive table."""
+    period_start = models.DateTimeField(unique=True)
+    period_end = models.DateTimeField()
+    table_name = models.CharField(max_length=63, unique=True)
+    row_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-period_start"]
+
+    def __str__(self):
+        return f"{self.table_name} ({self.row_count} rows)"
+
+
+class ReconciliationCheckpoint(models.Model):
+    """Ledger high-water mark of a completed reconcile_ledger run."""
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When last_transaction_id was read; entries stamped shortly before it may commit later.
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_transaction_id = models.BigIntegerField()
+    accounts_checked = models.PositiveIntegerField(default=0)
+    discrepancies = models.PositiveIntegerField(default=0)
+    incremental = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["-created_at"]
+        get_latest_by = "created_at"
+
+    def __str__(self):
+        return f"Reconciled up to tx {self.last_transaction_id} ({self.discrepancies} discrepancies)"
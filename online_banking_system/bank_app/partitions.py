@@ -0,0 +1,181 @@
+"""Hot/cold partitioning of the Transaction ledger.
+
+Closed calendar months are moved out of ``bank_app_transaction`` into one
+archive table per month (``bank_app_transaction_YYYYMM``), recorded in
+``LedgerPartition``.  Archive tables have no Django migrations; their models
+are built on the fly in a private app registry, from the columns that
+actually exist in each table.
+"""
+import heapq
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps.registry import Apps
+from django.db import connection, models, transaction as db_transaction
+
+from .models import LedgerPartition, Transaction
+
+_archive_apps = Apps()
+_archive_models = {}
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def archive_table_name(period_start: datetime) -> str:
+    return f"{Transaction._meta.db_table}_{period_start:%Y%m}"
+
+
+def _archive_field(field):
+    if field.primary_key:
+        return models.BigIntegerField(primary_key=True)
+    if field.is_relation:
+        # Plain integer column: archive rows must survive without FK constraints.
+        return models.BigIntegerField(null=field.null, db_index=field.name == "account")
+    name, path, args, kwargs = field.deconstruct()
+    kwargs.pop("auto_now_add", None)
+    kwargs.pop("auto_now", None)
+    if field.name == "timestamp":
+        kwargs["db_index"] = True
+    return field.__class__(*args, **kwargs)
+
+
+def archive_model(table_name: str, columns=None):
+    """Unmanaged model for ``table_name``, limited to ``columns`` if given."""
+    fields = [f for f in Transaction._meta.concrete_fields if columns is None or f.column in columns]
+    key = (table_name, tuple(f.column for f in fields))
+    if key not in _archive_models:
+        attrs = {f.attname: _archive_field(f) for f in fields}
+        attrs["__module__"] = __name__
+        attrs["Meta"] = type("Meta", (), {
+            "apps": _archive_apps,
+            "app_label": Transaction._meta.app_label,
+            "db_table": table_name,
+            "managed": False,
+        })
+        class_name = "Archive_" + table_name
+        _archive_models[key] = type(class_name, (models.Model,), attrs)
+    return _archive_models[key]
+
+
+def _table_columns(table_name: str):
+    with connection.cursor() as cursor:
+        return {c.name for c in connection.introspection.get_table_description(cursor, table_name)}
+
+
+def archive_period(period_start: datetime) -> LedgerPartition:
+    """Move every Transaction in the month starting at ``period_start`` to its archive table.
+
+    Table creation runs outside a transaction (SQLite cannot alter schema
+    inside one); the copy, delete and registry insert are one atomic step.
+    """
+    period_start = month_start(period_start)
+    period_end = next_month(period_start)
+    table_name = archive_table_name(period_start)
+    if table_name not in connection.introspection.table_names():
+        with connection.schema_editor() as editor:
+            editor.create_model(archive_model(table_name))
+
+    hot_table = Transaction._meta.db_table
+    archived_columns = _table_columns(table_name)
+    columns = [f.column for f in Transaction._meta.concrete_fields if f.column in archived_columns]
+    column_sql = ", ".join(connection.ops.quote_name(c) for c in columns)
+    bounds = [connection.ops.adapt_datetimefield_value(period_start),
+              connection.ops.adapt_datetimefield_value(period_end)]
+    ts = connection.ops.quote_name(Transaction._meta.get_field("timestamp").column)
+    where = f"{ts} >= %s AND {ts} < %s"
+
+    with db_transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {connection.ops.quote_name(table_name)} ({column_sql}) "
+                f"SELECT {column_sql} FROM {connection.ops.quote_name(hot_table)} WHERE {where}",
+                bounds,
+            )
+            moved = cursor.rowcount
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(hot_table)} WHERE {where}", bounds)
+        partition, created = LedgerPartition.objects.get_or_create(
+            period_start=period_start,
+            defaults={"period_end": period_end, "table_name": table_name, "row_count": moved},
+        )
+        if not created:
+            partition.row_count += moved
+            partition.save(update_fields=["row_count"])
+    return partition
+
+
+def closed_periods(cutoff: datetime):
+    """Month starts with hot rows whose whole month ends on or before ``cutoff``.
+
+    Walks the timestamp index one month at a time, skipping empty months.
+    """
+    periods = []
+    hot = Transaction.objects.order_by("timestamp").values_list("timestamp", flat=True)
+    oldest = hot.first()
+    while oldest is not None and next_month(month_start(oldest)) <= cutoff:
+        periods.append(month_start(oldest))
+        oldest = hot.filter(timestamp__gte=next_month(periods[-1])).first()
+    return periods
+
+
+def archived_querysets():
+    """One queryset per archive table, for aggregating across the cold ledger."""
+    for partition in LedgerPartition.objects.all():
+        yield archive_model(partition.table_name, _table_columns(partition.table_name)).objects.all()
+
+
+def find_entry(**lookups):
+    """First Transaction matching ``lookups``, from the hot table or any archive partition.
+
+    For rare point lookups (idempotent replays of old requests); archived rows
+    come back as unsaved ``Transaction`` instances.
+    """
+    entry = Transaction.objects.filter(**lookups).first()
+    if entry is not None:
+        return entry
+    for partition in LedgerPartition.objects.all():
+        model = archive_model(partition.table_name, _table_columns(partition.table_name))
+        values = model.objects.filter(**lookups).values().first()
+        if values is not None:
+            return Transaction(**values)
+    return None
+
+
+def history(hot_queryset, account_id=None, start=None, end=None):
+    """Ledger entries in [start, end), newest first, merged from hot and archived tables.
+
+    Archived rows come back as unsaved ``Transaction`` instances.
+    """
+    if start is not None:
+        hot_queryset = hot_queryset.filter(timestamp__gte=start)
+    if end is not None:
+        hot_queryset = hot_queryset.filter(timestamp__lt=end)
+    sources = [hot_queryset.order_by("-timestamp", "-id").iterator()]
+
+    partitions = LedgerPartition.objects.all()
+    if start is not None:
+        partitions = partitions.filter(period_end__gt=start)
+    if end is not None:
+        partitions = partitions.filter(period_start__lt=end)
+    for partition in partitions:
+        sources.append(_archived_rows(partition.table_name, account_id, start, end))
+    return heapq.merge(*sources, key=lambda tx: (tx.timestamp, tx.pk), reverse=True)
+
+
+def _archived_rows(table_name, account_id, start, end):
+    model = archive_model(table_name, _table_columns(table_name))
+    rows = model.objects.all()
+    if account_id is not None:
+        rows = rows.filter(account_id=account_id)
+    if start is not None:
+        rows = rows.filter(timestamp__gte=start)
+    if end is not None:
+        rows = rows.filter(timestamp__lt=end)
+    for values in rows.order_by("-timestamp", "-id").values().iterator():
+        yield Transaction(**values)
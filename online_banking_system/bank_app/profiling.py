@@ -0,0 +1,230 @@
+"""On-demand profiling of live requests, switched on by staff for a bounded time.
+
+Two modes, both aggregated inside the worker process that received the
+``start`` request (each worker profiles only itself, so status and download
+must reach the same worker):
+
+* ``sample``: a background thread snapshots the stacks of threads that are
+  serving a matching request every ``SAMPLE_INTERVAL`` seconds and counts
+  them as collapsed stacks (``outer;...;inner count``), the input format of
+  flamegraph tools.
+* ``cprofile``: a ``rate`` fraction of matching requests run under cProfile
+  and are merged into one ``pstats.Stats``.  Only one request at a time is
+  profiled (Python 3.12+ allows a single active profiler per process);
+  requests arriving meanwhile run unprofiled.
+
+With no session running, ``ProfilingMiddleware`` costs one global lookup
+per request.
+"""
+import cProfile
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.urls import Resolver404, resolve
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+MODES = (SAMPLE, CPROFILE)
+MAX_SECONDS = 300
+SAMPLE_INTERVAL = 0.005
+MAX_DEPTH = 100
+MAX_STACKS = 20000  # distinct stacks kept; samples of new stacks beyond this are only counted
+
+_active = None   # the running session; the only thing the middleware looks at
+_latest = None   # the running or most recently finished session, kept for download
+_lock = threading.Lock()
+_cprofile_lock = threading.Lock()  # held by the one request currently under cProfile
+
+
+def collapse(frame) -> str:
+    """``frame`` and its callers as one collapsed-stack line, outermost first."""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def profilable_url_names() -> set:
+    from .urls import urlpatterns  # imported late: urls imports the views that import this module
+    return {p.name for p in urlpatterns if p.name and not p.name.startswith("profiler_")}
+
+
+class ProfilingSession:
+    def __init__(self, mode: str, seconds: int, url_names, rate: float = 1.0):
+        self.mode = mode
+        self.url_names = frozenset(url_names)
+        self.rate = rate
+        self.seconds = seconds
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.requests = 0
+        self.profiled = 0
+        self.skipped_busy = 0
+        self.samples = 0
+        self.truncated = 0
+        self.stacks = Counter()
+        self.stats = None
+        self._threads = set()  # idents of threads currently serving a matching request
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        if mode == SAMPLE:
+            threading.Thread(target=self._sample_loop, name="bank-profiler", daemon=True).start()
+
+    @property
+    def active(self) -> bool:
+        return not self._stopped.is_set() and time.monotonic() < self.deadline
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def matches(self, request) -> bool:
+        try:
+            return resolve(request.path_info).url_name in self.url_names
+        except Resolver404:
+            return False
+
+    def process(self, request, get_response):
+        if not self.matches(request):
+            return get_response(request)
+        with self._lock:
+            self.requests += 1
+        if self.mode == SAMPLE:
+            ident = threading.get_ident()
+            with self._lock:
+                self._threads.add(ident)
+            try:
+                return get_response(request)
+            finally:
+                with self._lock:
+                    self._threads.discard(ident)
+        if random.random() >= self.rate:
+            return get_response(request)
+        if not _cprofile_lock.acquire(blocking=False):
+            with self._lock:
+                self.skipped_busy += 1
+            return get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(get_response, request)
+            finally:
+                with self._lock:
+                    self.profiled += 1
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profiler)
+                    else:
+                        self.stats.add(profiler)
+        finally:
+            _cprofile_lock.release()
+
+    def _sample_loop(self):
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            if time.monotonic() >= self.deadline:
+                break
+            with self._lock:
+                idents = list(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            stacks = [collapse(frames[i]) for i in idents if i in frames]
+            with self._lock:
+                for stack in stacks:
+                    self.samples += 1
+                    if stack in self.stacks or len(self.stacks) < MAX_STACKS:
+                        self.stacks[stack] += 1
+                    else:
+                        self.truncated += 1
+        self._stopped.set()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "url_names": sorted(self.url_names),
+                "rate": self.rate,
+                "active": self.active,
+                "started_at": self.started_at,
+                "remaining_seconds": round(self.deadline - time.monotonic(), 1) if self.active else 0.0,
+                "requests": self.requests,
+                "profiled": self.profiled,
+                "skipped_busy": self.skipped_busy,
+                "samples": self.samples,
+                "distinct_stacks": len(self.stacks),
+                "truncated_samples": self.truncated,
+            }
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, one ``stack count`` line per distinct stack."""
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def pstats_bytes(self):
+        """The merged profile in the ``pstats.Stats.dump_stats`` file format, or None."""
+        with self._lock:
+            return marshal.dumps(self.stats.stats) if self.stats is not None else None
+
+
+def start(mode: str, seconds: int, url_names, rate: float = 1.0) -> ProfilingSession:
+    """Begin profiling requests to ``url_names`` for ``seconds`` (capped at ``MAX_SECONDS``)."""
+    global _active, _latest
+    if mode not in MODES:
+        raise ValueError(f"Unknown profiling mode {mode!r}.")
+    if not 0 < rate <= 1:
+        raise ValueError("Rate must be in (0, 1].")
+    url_names = set(url_names)
+    if not url_names:
+        raise ValueError("Choose at least one URL name to profile.")
+    unknown = url_names - profilable_url_names()
+    if unknown:
+        raise ValueError(f"Unknown URL names: {', '.join(sorted(unknown))}.")
+    with _lock:
+        if _active is not None and _active.active:
+            raise ValueError("A profiling session is already running.")
+        if _active is not None:
+            _active.close()
+        session = _active = _latest = ProfilingSession(mode, max(1, min(int(seconds), MAX_SECONDS)), url_names, rate)
+    return session
+
+
+def stop():
+    """End the running session, if any; its results stay available via ``latest``."""
+    global _active
+    with _lock:
+        session, _active = _active, None
+    if session is not None:
+        session.close()
+    return session
+
+
+def _expire(session) -> None:
+    global _active
+    with _lock:
+        if _active is session:  # a new session may have replaced it meanwhile
+            _active = None
+    session.close()
+
+
+def latest():
+    return _latest
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = _active
+        if session is None:
+            return self.get_response(request)
+        if not session.active:
+            _expire(session)
+            return self.get_response(request)
+        return session.process(request, self.get_response)
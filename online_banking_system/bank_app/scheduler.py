@@ -0,0 +1,95 @@
+"""Batch execution of RecurringInstruction debits.
+
+Several ``run_recurring`` processes can run at once.  Each one claims a chunk
+of due instructions by stamping ``claimed_by`` with a conditional UPDATE, so
+an instruction is only executed by the worker whose claim succeeded.  A claim
+expires after a lease, so rows held by a crashed worker are picked up again.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from money import quantize
+from . import anomaly
+from .models import Account, RecurringInstruction, Transaction, lock_accounts
+
+
+def add_months(value: date, months: int, day_of_month: int) -> date:
+    """Same ``day_of_month`` ``months`` later, clamped to the month's last day."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def _due(today: date):
+    now = timezone.now()
+    return RecurringInstruction.objects.filter(active=True, next_run_date__lte=today).filter(
+        Q(claimed_by__isnull=True) | Q(claim_expires_at__lt=now)
+    )
+
+
+def claim_due(worker_id: str, today: date, chunk_size: int, lease: timedelta) -> list:
+    """Claim up to ``chunk_size`` due instructions for ``worker_id`` and return their ids."""
+    with db_transaction.atomic():
+        # SKIP LOCKED lets concurrent workers pass over each other's candidates
+        # on PostgreSQL; elsewhere the conditional UPDATE below is what arbitrates.
+        candidates = list(
+            _due(today).select_for_update(skip_locked=True)
+            .order_by("next_run_date", "id").values_list("id", flat=True)[:chunk_size]
+        )
+        if not candidates:
+            return []
+        _due(today).filter(id__in=candidates).update(
+            claimed_by=worker_id, claim_expires_at=timezone.now() + lease
+        )
+    return list(RecurringInstruction.objects.filter(id__in=candidates, claimed_by=worker_id)
+                .values_list("id", flat=True))
+
+
+def execute_claimed(worker_id: str, ids: list, today: date) -> dict:
+    """Debit every claimed instruction in one atomic batch and release the claims.
+
+    Each run pays at most one installment per instruction; ``next_run_date``
+    moves to the first scheduled date after ``today``.  Rows whose lease has
+    expired are skipped: another worker may already have re-claimed them.
+    """
+    with db_transaction.atomic():
+        # Lock the claimed rows (before any account) so an expired lease cannot be
+        # re-claimed and executed by another worker while this batch is in flight.
+        instructions = list(
+            RecurringInstruction.objects.select_for_update()
+            .filter(id__in=ids, claimed_by=worker_id, claim_expires_at__gt=timezone.now()).order_by("id")
+        )
+        accounts = lock_accounts(*{ins.account_id for ins in instructions})
+        entries, changed, failed = [], {}, 0
+        for ins in instructions:
+            account = accounts[ins.account_id]
+            amount = quantize(ins.amount)
+            if amount > account.balance:
+                ins.failures += 1
+                ins.last_error = "Insufficient balance."
+                failed += 1
+            else:
+                account.balance -= amount
+                changed[account.pk] = account
+                entries.append(Transaction(account_id=account.pk, amount=amount, tx_type=Transaction.RECURRING_DEBIT))
+                ins.installments_paid += 1
+                ins.last_error = ""
+            while ins.next_run_date <= today:
+                ins.next_run_date = add_months(ins.next_run_date, 1, ins.day_of_month)
+            if ins.installments_total is not None and ins.installments_paid >= ins.installments_total:
+                ins.active = False
+            ins.claimed_by = None
+            ins.claim_expires_at = None
+
+        Account.objects.bulk_update(list(changed.values()), ["balance"], batch_size=500)
+        anomaly.schedule(Transaction.objects.bulk_create(entries, batch_size=500))
+        RecurringInstruction.objects.bulk_update(
+            instructions,
+            ["failures", "last_error", "installments_paid", "next_run_date", "active", "claimed_by", "claim_expires_at"],
+            batch_size=500,
+        )
+    return {"executed": len(entries), "failed": failed}
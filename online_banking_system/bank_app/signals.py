@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import anomaly
+from .middleware import user_cache, user_cache_key
+from .models import Transaction
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def evict_cached_user(sender, instance, **kwargs):
+    user_cache().delete(user_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=Transaction)
+def score_new_entry(sender, instance, created, **kwargs):
+    if created:
+        anomaly.schedule([instance])
@@ -1,8 +1,30 @@
-from django.test import TestCase
+from django.conf import settings
+from django.db import connection
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.contrib.admin import site
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
-from .models import Account
+from io import StringIO
+from unittest import skipUnless
+import marshal
+import tempfile
+import time
+from .models import (
+    Account, AnomalyFlag, LedgerPartition, PendingTransfer, RecurringInstruction, ReconciliationCheckpoint,
+    Transaction,
+)
+from . import anomaly, profiling
+from .partitions import archive_model
+from .scheduler import add_months, claim_due, execute_claimed
+from .transfers import queue_transfer, settle_pending_transfers, transfer
+from .throttling import parse_rate, take_token, throttle_metrics
 from finance_tools import calculate_emi
 
 class BankingCoreTests(TestCase):
@@ -33,3 +55,489 @@ class BankingCoreTests(TestCase):
     def test_emi_function(self):
         emi = calculate_emi(100000, 10, 12)
         self.assertIsInstance(emi, float)
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="burst", password="strongpassword123")
+        self.account = Account.objects.create(user=self.user, balance=Decimal("0.00"))
+        self.client.login(username="burst", password="strongpassword123")
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("30/m"), (30, 0.5))
+        with self.assertRaises(ValueError):
+            parse_rate("often")
+
+    def test_bucket_refills(self):
+        self.assertEqual(take_token("t:refill", 1, 1.0, now=100.0), 0)
+        self.assertAlmostEqual(take_token("t:refill", 1, 1.0, now=100.5), 0.5)
+        self.assertEqual(take_token("t:refill", 1, 1.0, now=102.0), 0)
+
+    def test_deposit_burst_returns_429(self):
+        for _ in range(10):
+            self.client.post(reverse("deposit"), {"amount": "1.00"})
+        resp = self.client.post(reverse("deposit"), {"amount": "1.00"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("Retry-After", resp)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("10.00"))
+        self.assertGreaterEqual(throttle_metrics()["deposit"]["throttled"], 1)
+
+    def test_get_is_not_throttled(self):
+        for _ in range(15):
+            self.assertEqual(self.client.get(reverse("deposit")).status_code, 200)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="retry", password="strongpassword123")
+        self.account = Account.objects.create(user=self.user, balance=Decimal("100.00"))
+
+    def test_retry_returns_original_transaction(self):
+        first = self.account.deposit(Decimal("50.00"), idempotency_key="abc")
+        second = self.account.deposit(Decimal("50.00"), idempotency_key="abc")
+        self.assertEqual(first.pk, second.pk)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("150.00"))
+        self.assertEqual(Transaction.objects.filter(account=self.account).count(), 1)
+
+    def test_key_reuse_with_different_request_rejected(self):
+        self.account.withdraw(Decimal("10.00"), idempotency_key="k1")
+        with self.assertRaises(ValueError):
+            self.account.withdraw(Decimal("20.00"), idempotency_key="k1")
+
+    def test_withdraw_header_retry_via_view(self):
+        self.client.login(username="retry", password="strongpassword123")
+        for _ in range(3):
+            self.client.post(reverse("withdraw"), {"amount": "30.00"}, HTTP_IDEMPOTENCY_KEY="mobile-1")
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("70.00"))
+
+
+class AuthProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="fast", password="strongpassword123")
+        Account.objects.create(user=self.user)
+        # Cached users need a cache shared by every worker; a file cache is the simplest one.
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.user_cache = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                                "LOCATION": tmp.name}},
+            AUTH_USER_CACHE_TIMEOUT=300,
+        )
+
+    def _dashboard_queries(self):
+        # A fresh client so SessionMiddleware picks up the overridden engine.
+        client = Client()
+        client.login(username="fast", password="strongpassword123")
+        client.get(reverse("dashboard"))
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(reverse("dashboard"))
+        return len(ctx.captured_queries)
+
+    def test_cached_profile_saves_queries(self):
+        baseline = self._dashboard_queries()
+        with self.user_cache, override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db"):
+            cached = self._dashboard_queries()
+        self.assertEqual(baseline - cached, 2)
+
+    def test_password_change_evicts_cached_user(self):
+        with self.user_cache:
+            self.client.login(username="fast", password="strongpassword123")
+            self.client.get(reverse("dashboard"))
+            self.user.set_password("anotherpassword456")
+            self.user.save()
+            resp = self.client.get(reverse("dashboard"))
+        self.assertEqual(resp.status_code, 302)
+
+    @override_settings(AUTH_USER_CACHE_TIMEOUT=300)
+    def test_per_process_user_cache_is_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Client().get(reverse("index"))
+
+    def test_rehash_on_login_when_cost_changes(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.user.set_password("strongpassword123")
+            self.user.save()
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.client.post(reverse("login"), {"username": "fast", "password": "strongpassword123"})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+
+class RenderingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="viewer", password="strongpassword123")
+        self.client.login(username="viewer", password="strongpassword123")
+
+    def test_tool_page_conditional_get(self):
+        resp = self.client.get(reverse("sip_tool"))
+        self.assertIn("ETag", resp)
+        self.assertIn("Last-Modified", resp)
+        again = self.client.get(reverse("sip_tool"), HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_tool_results_are_not_conditional(self):
+        resp = self.client.get(reverse("sip_tool"), {"monthly_investment": 500, "annual_rate_percent": 12, "years": 5})
+        self.assertNotIn("ETag", resp)
+
+    def test_navbar_fragment_is_per_user(self):
+        self.client.get(reverse("tools_menu"))
+        User.objects.create_user(username="other", password="strongpassword123")
+        self.client.login(username="other", password="strongpassword123")
+        resp = self.client.get(reverse("tools_menu"))
+        self.assertContains(resp, "Hi, other")
+        self.assertNotContains(resp, "Hi, viewer")
+
+
+class TransactionAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username="ops", password="strongpassword123")
+        self.client.login(username="ops", password="strongpassword123")
+        for name in ("alice", "bob"):
+            account = Account.objects.create(user=User.objects.create_user(username=name))
+            Transaction.objects.bulk_create(
+                Transaction(account=account, amount=Decimal(i + 1), tx_type=Transaction.DEPOSIT) for i in range(60)
+            )
+        self.url = reverse("admin:bank_app_transaction_changelist")
+
+    def test_changelist_has_no_per_row_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertLess(len(ctx.captured_queries), 15)
+        self.assertFalse(any("COUNT(*)" in q["sql"] and "LIMIT" not in q["sql"] for q in ctx.captured_queries))
+
+    def test_unfiltered_count_ignores_archived_ids(self):
+        Transaction.objects.filter(pk__lte=Transaction.objects.order_by("pk")[99].pk).delete()
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.context_data["cl"].result_count, 20)
+
+    def test_keyset_link_pages_by_id(self):
+        resp = self.client.get(self.url)
+        self.assertIn("id__lt=", resp.context_data["keyset_next"])
+        older = self.client.get(self.url + resp.context_data["keyset_next"])
+        self.assertEqual(len(older.context_data["cl"].result_list), 20)
+
+    def test_search_username_and_amount(self):
+        resp = self.client.get(self.url, {"q": "alice"})
+        self.assertEqual(resp.context_data["cl"].result_count, 60)
+        resp = self.client.get(self.url, {"q": "7.00"})
+        self.assertEqual(resp.context_data["cl"].result_count, 2)
+        resp = self.client.get(self.url, {"q": timezone.localdate().isoformat()})
+        self.assertEqual(resp.context_data["cl"].result_count, 120)
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite's")
+    def test_search_uses_one_indexed_predicate(self):
+        admin_view = site._registry[Transaction]
+        for term in ("7.00", "2025-01-02", "alice"):
+            queryset, _ = admin_view.get_search_results(None, Transaction.objects.all(), term)
+            with connection.cursor() as cursor:
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+            self.assertNotIn("SCAN bank_app_transaction", plan, term)
+
+    def test_export_csv_streams_selected_rows(self):
+        ids = list(Transaction.objects.filter(account__user__username="bob").values_list("id", flat=True)[:3])
+        resp = self.client.post(self.url, {"action": "export_csv", "_selected_action": ids})
+        body = b"".join(resp.streaming_content).decode()
+        self.assertEqual(len(body.strip().splitlines()), 4)
+        self.assertIn("bob", body)
+
+
+class LedgerPartitionTests(TransactionTestCase):
+    def setUp(self):
+        self.account = Account.objects.create(user=User.objects.create_user(username="saver"))
+        self.other = Account.objects.create(user=User.objects.create_user(username="spender"))
+        self.old = datetime(2024, 1, 15, tzinfo=dt_timezone.utc)
+        for account in (self.account, self.other):
+            for days, amount in ((0, "10.00"), (31, "20.00")):
+                tx = Transaction.objects.create(account=account, amount=Decimal(amount), tx_type=Transaction.DEPOSIT)
+                Transaction.objects.filter(pk=tx.pk).update(timestamp=self.old + timedelta(days=days))
+        Transaction.objects.create(account=self.account, amount=Decimal("30.00"), tx_type=Transaction.DEPOSIT)
+
+    def tearDown(self):
+        for partition in LedgerPartition.objects.all():
+            with connection.schema_editor() as editor:
+                editor.delete_model(archive_model(partition.table_name))
+
+    def test_archive_moves_closed_months(self):
+        call_command("archive_ledger", stdout=StringIO())
+        self.assertEqual(LedgerPartition.objects.count(), 2)
+        self.assertEqual(Transaction.objects.count(), 1)
+        amounts = [tx.amount for tx in self.account.transactions.history()]
+        self.assertEqual(amounts, [Decimal("30.00"), Decimal("20.00"), Decimal("10.00")])
+
+    def test_idempotent_retry_after_archiving(self):
+        first = self.account.deposit(Decimal("5.00"), idempotency_key="k")
+        Transaction.objects.filter(pk=first.pk).update(timestamp=self.old)
+        call_command("archive_ledger", stdout=StringIO())
+        self.assertFalse(Transaction.objects.filter(pk=first.pk).exists())
+        replayed = self.account.deposit(Decimal("5.00"), idempotency_key="k")
+        self.assertEqual(replayed.pk, first.pk)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("5.00"))
+
+    def test_history_routes_date_bounds(self):
+        call_command("archive_ledger", stdout=StringIO())
+        start = datetime(2024, 2, 1, tzinfo=dt_timezone.utc)
+        entries = list(self.other.transactions.history(start=start, end=start + timedelta(days=30)))
+        self.assertEqual([tx.amount for tx in entries], [Decimal("20.00")])
+        self.assertEqual(entries[0].account_id, self.other.pk)
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        self.good = Account.objects.create(user=User.objects.create_user(username="good"))
+        self.bad = Account.objects.create(user=User.objects.create_user(username="bad"))
+        self.good.deposit(Decimal("100.00"))
+        self.good.withdraw(Decimal("40.00"))
+        self.bad.deposit(Decimal("50.00"))
+        Account.objects.filter(pk=self.bad.pk).update(balance=Decimal("75.00"))
+
+    def _run(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command("reconcile_ledger", "--workers", "1", "--chunk-size", "1", *args, stdout=out, stderr=err)
+        return out.getvalue().splitlines()
+
+    def test_reports_only_mismatched_accounts(self):
+        report = self._run()
+        self.assertEqual(report[1:], [f"{self.bad.pk},75.00,50.00,25.00"])
+        checkpoint = ReconciliationCheckpoint.objects.get()
+        self.assertEqual(checkpoint.accounts_checked, 2)
+        self.assertEqual(checkpoint.last_transaction_id, Transaction.objects.latest("id").id)
+
+    def test_incremental_rechecks_only_touched_accounts(self):
+        Transaction.objects.update(timestamp=timezone.now() - timedelta(days=1))
+        self._run()
+        self.good.deposit(Decimal("1.00"))
+        self.assertEqual(self._run("--incremental")[1:], [])
+        self.assertEqual(ReconciliationCheckpoint.objects.latest().accounts_checked, 1)
+
+    def test_incremental_rescans_entries_near_the_checkpoint(self):
+        self._run()
+        # No id is past the checkpoint, but recent entries may have committed after it was taken.
+        Account.objects.filter(pk=self.good.pk).update(balance=Decimal("1.00"))
+        self.assertIn(f"{self.good.pk},1.00,60.00,-59.00", self._run("--incremental"))
+        self.assertEqual(self._run("--incremental", "--safety-margin", "0")[1:], [])
+
+
+class TransferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = Account.objects.create(user=User.objects.create_user(username="alice", password="strongpassword123"),
+                                            balance=Decimal("100.00"))
+        self.shop = Account.objects.create(user=User.objects.create_user(username="shop"), balance=Decimal("10.00"))
+
+    def test_transfer_writes_paired_entries(self):
+        out, incoming = transfer(self.alice, self.shop, Decimal("30.00"))
+        self.assertEqual(out.reference, incoming.reference)
+        self.assertEqual((out.tx_type, incoming.tx_type), (Transaction.TRANSFER_OUT, Transaction.TRANSFER_IN))
+        self.alice.refresh_from_db()
+        self.shop.refresh_from_db()
+        self.assertEqual((self.alice.balance, self.shop.balance), (Decimal("70.00"), Decimal("40.00")))
+
+    def test_transfer_insufficient_and_retry(self):
+        with self.assertRaises(ValueError):
+            transfer(self.shop, self.alice, Decimal("50.00"))
+        first = transfer(self.alice, self.shop, Decimal("5.00"), idempotency_key="t1")
+        self.assertEqual(transfer(self.alice, self.shop, Decimal("5.00"), idempotency_key="t1"), first)
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.balance, Decimal("95.00"))
+
+    def test_settlement_nets_pair(self):
+        for _ in range(5):
+            queue_transfer(self.alice, self.shop, Decimal("10.00"))
+        queue_transfer(self.shop, self.alice, Decimal("15.00"))
+        result = settle_pending_transfers()
+        self.assertEqual(result, {"settled": 6, "failed": 0, "entries": 2})
+        self.shop.refresh_from_db()
+        self.assertEqual(self.shop.balance, Decimal("45.00"))
+        self.assertFalse(PendingTransfer.objects.filter(status=PendingTransfer.PENDING).exists())
+
+    def test_settlement_fails_uncovered_pair(self):
+        queue_transfer(self.shop, self.alice, Decimal("20.00"))
+        self.assertEqual(settle_pending_transfers()["failed"], 1)
+        self.shop.refresh_from_db()
+        self.assertEqual(self.shop.balance, Decimal("10.00"))
+
+    def test_transfer_view(self):
+        self.client.login(username="alice", password="strongpassword123")
+        self.client.post(reverse("transfer"), {"recipient": "shop", "amount": "25.00"})
+        self.shop.refresh_from_db()
+        self.assertEqual(self.shop.balance, Decimal("35.00"))
+        resp = self.client.post(reverse("transfer"), {"recipient": "nobody", "amount": "1.00"})
+        self.assertContains(resp, "No account with that username.")
+
+
+class RecurringSchedulerTests(TestCase):
+    def setUp(self):
+        self.account = Account.objects.create(user=User.objects.create_user(username="investor"),
+                                              balance=Decimal("1000.00"))
+
+    def _instruction(self, **kwargs):
+        values = {"account": self.account, "kind": RecurringInstruction.SIP, "amount": Decimal("300.00"),
+                  "day_of_month": 31, "next_run_date": date(2025, 1, 31)}
+        values.update(kwargs)
+        return RecurringInstruction.objects.create(**values)
+
+    def _run(self, day):
+        call_command("run_recurring", "--date", day.isoformat(), "--chunk-size", "2", stdout=StringIO())
+
+    def test_add_months_clamps_day(self):
+        self.assertEqual(add_months(date(2025, 1, 31), 1, 31), date(2025, 2, 28))
+        self.assertEqual(add_months(date(2025, 12, 15), 1, 15), date(2026, 1, 15))
+
+    def test_due_instructions_debit_and_advance(self):
+        sip = self._instruction(installments_total=2)
+        self._instruction(next_run_date=date(2025, 3, 1))
+        self._run(date(2025, 2, 1))
+        sip.refresh_from_db()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("700.00"))
+        self.assertEqual(sip.next_run_date, date(2025, 2, 28))
+        self.assertIsNone(sip.claimed_by)
+        self._run(date(2025, 2, 28))
+        sip.refresh_from_db()
+        self.assertFalse(sip.active)
+        self.assertEqual(Transaction.objects.filter(tx_type=Transaction.RECURRING_DEBIT).count(), 2)
+
+    def test_insufficient_balance_is_recorded(self):
+        rd = self._instruction(kind=RecurringInstruction.RD, amount=Decimal("5000.00"))
+        self._run(date(2025, 2, 1))
+        rd.refresh_from_db()
+        self.assertEqual((rd.failures, rd.last_error), (1, "Insufficient balance."))
+
+    def test_claimed_rows_are_skipped_by_other_workers(self):
+        self._instruction()
+        self.assertEqual(len(claim_due("w1", date(2025, 2, 1), 10, timedelta(minutes=5))), 1)
+        self.assertEqual(claim_due("w2", date(2025, 2, 1), 10, timedelta(minutes=5)), [])
+        RecurringInstruction.objects.update(claim_expires_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(len(claim_due("w2", date(2025, 2, 1), 10, timedelta(minutes=5))), 1)
+
+    def test_expired_lease_is_not_executed(self):
+        ins = self._instruction()
+        ids = claim_due("w1", date(2025, 2, 1), 10, timedelta(minutes=5))
+        RecurringInstruction.objects.update(claim_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(execute_claimed("w1", ids, date(2025, 2, 1)), {"executed": 0, "failed": 0})
+        ins.refresh_from_db()
+        self.assertEqual((ins.installments_paid, ins.claimed_by), (0, "w1"))
+
+
+class AnomalyTests(TestCase):
+    def setUp(self):
+        anomaly._cache().clear()
+        self.account = Account.objects.create(user=User.objects.create_user(username="spender"),
+                                              balance=Decimal("100000.00"))
+
+    def _withdraw(self, *amounts):
+        with self.captureOnCommitCallbacks(execute=True):
+            for amount in amounts:
+                self.account.withdraw(Decimal(amount))
+
+    def test_spike_is_flagged_after_history(self):
+        self._withdraw("100", "110", "90", "105", "95", "100")
+        self.assertFalse(AnomalyFlag.objects.exists())
+        self._withdraw("5000")
+        flag = AnomalyFlag.objects.get()
+        self.assertEqual(flag.reasons, "amount_spike")
+        self.assertGreater(flag.score, anomaly.Z_THRESHOLD)
+
+    def test_burst_is_flagged(self):
+        self._withdraw(*["10"] * anomaly.BURST_LIMIT)
+        self.assertFalse(AnomalyFlag.objects.exists())
+        self._withdraw("10")
+        self.assertIn("burst", AnomalyFlag.objects.get().reasons)
+
+    def test_deposits_are_not_scored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.account.deposit(Decimal("50.00"))
+        self.assertIsNone(anomaly.get_state(self.account.pk))
+
+    def test_backfill_matches_streaming_state(self):
+        self._withdraw("100", "250", "80", "120", "90")
+        streamed = anomaly.get_state(self.account.pk)
+        anomaly._cache().clear()
+        self.assertEqual(anomaly.backfill(), 1)
+        rebuilt = anomaly.get_state(self.account.pk)
+        self.assertAlmostEqual(rebuilt.mean, streamed.mean)
+        self.assertAlmostEqual(rebuilt.var, streamed.var)
+        self.assertEqual(rebuilt[2:], streamed[2:])
+
+    def test_backfill_refuses_a_cache_too_small_for_every_account(self):
+        other = Account.objects.create(user=User.objects.create_user(username="other"), balance=Decimal("10.00"))
+        other.withdraw(Decimal("1.00"))
+        self._withdraw("1.00")
+        small = {**settings.CACHES, "anomaly": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                                 "LOCATION": "anomaly-small", "OPTIONS": {"MAX_ENTRIES": 1}}}
+        with override_settings(CACHES=small), self.assertRaises(ImproperlyConfigured):
+            anomaly.backfill()
+
+
+class ProfilerTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="ops", password="pw", is_staff=True)
+        self.client.force_login(self.staff)
+
+    def tearDown(self):
+        profiling.stop()
+
+    def test_staff_only(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username="customer"))
+        self.assertEqual(client.get(reverse("profiler_status")).status_code, 302)
+
+    def test_rejects_unknown_url_names(self):
+        response = self.client.post(reverse("profiler_start"), {"url_name": ["profiler_status"], "seconds": 5})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(profiling._active)
+
+    def test_sampling_aggregates_collapsed_stacks(self):
+        session = profiling.start(profiling.SAMPLE, 5, ["index"])
+
+        def slow_view(request):
+            time.sleep(0.1)
+            return "ok"
+
+        self.assertEqual(session.process(RequestFactory().get("/"), slow_view), "ok")
+        session.process(RequestFactory().get("/tools/"), slow_view)  # not a matching URL
+        self.assertEqual(session.status()["requests"], 1)
+        self.assertGreater(session.samples, 0)
+        self.assertIn("slow_view", session.collapsed())
+
+    def test_cprofile_download(self):
+        response = self.client.post(reverse("profiler_start"),
+                                    {"mode": "cprofile", "url_name": ["index"], "seconds": 5})
+        self.assertEqual(response.status_code, 201)
+        self.client.get(reverse("index"))
+        self.assertEqual(self.client.get(reverse("profiler_status")).json()["profiled"], 1)
+        response = self.client.get(reverse("profiler_download"))
+        stats = marshal.loads(response.content)
+        self.assertTrue(any(func[2] == "index" for func in stats))
+
+    def test_cprofile_skips_concurrent_requests(self):
+        session = profiling.start(profiling.CPROFILE, 5, ["index"])
+        inner = []
+
+        def view(request):
+            # A second matching request while this one is being profiled.
+            inner.append(session.process(RequestFactory().get("/"), lambda r: "inner"))
+            return "outer"
+
+        self.assertEqual(session.process(RequestFactory().get("/"), view), "outer")
+        self.assertEqual(inner, ["inner"])
+        self.assertEqual((session.profiled, session.skipped_busy), (1, 1))
+
+    def test_session_expires(self):
+        session = profiling.start(profiling.CPROFILE, 5, ["index"])
+        session.deadline = time.monotonic() - 1
+        self.client.get(reverse("index"))
+        self.assertIsNone(profiling._active)
+        self.assertEqual(session.profiled, 0)
@@ -0,0 +1,101 @@
+"""Per-user, per-endpoint token-bucket throttling.
+
+Limits are attached to views in ``bank_app/urls.py``::
+
+    path("deposit/", throttle("10/m")(views.deposit), name="deposit")
+
+Each (URL name, user) pair gets a bucket of ``N`` tokens that refills at
+``N`` per period.  Bucket state lives in the cache named by
+``THROTTLE_CACHE`` (the process-local default cache unless configured).
+"""
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+_lock = threading.Lock()
+_allowed = Counter()
+_throttled = Counter()
+
+
+def parse_rate(rate: str):
+    """'10/m' -> (capacity 10, refill 10/60 tokens per second)."""
+    try:
+        count, period = rate.split("/")
+        capacity = int(count)
+        seconds = _PERIODS[period[0]]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Invalid throttle rate {rate!r}; expected e.g. '10/m'.")
+    if capacity <= 0:
+        raise ValueError("Throttle rate must allow at least one request.")
+    return capacity, capacity / seconds
+
+
+def _client_ident(request) -> str:
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def take_token(key: str, capacity: int, refill_per_second: float, now: float = None) -> float:
+    """Consume one token from the bucket at ``key``.
+
+    Returns 0 when the request may proceed, otherwise the number of seconds
+    until a token becomes available.
+    """
+    cache = caches[getattr(settings, "THROTTLE_CACHE", "default")]
+    now = time.time() if now is None else now
+    with _lock:
+        tokens, last = cache.get(key, (float(capacity), now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_second)
+        if tokens >= 1:
+            wait = 0.0
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / refill_per_second
+        timeout = math.ceil(capacity / refill_per_second)
+        cache.set(key, (tokens, now), timeout)
+    return wait
+
+
+def throttle(rate: str, methods=("POST",)):
+    """Limit ``methods`` on the decorated view to ``rate`` per user."""
+    capacity, refill = parse_rate(rate)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if not getattr(settings, "THROTTLE_ENABLED", True) or request.method not in methods:
+                return view_func(request, *args, **kwargs)
+            scope = request.resolver_match.url_name if request.resolver_match else view_func.__name__
+            ident = _client_ident(request)
+            wait = take_token(f"throttle:{scope}:{ident}", capacity, refill)
+            if wait:
+                with _lock:
+                    _throttled[scope] += 1
+                logger.info("Throttled %s for %s (retry in %.1fs)", scope, ident, wait)
+                response = HttpResponse("Too many requests. Please retry shortly.", status=429)
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+            with _lock:
+                _allowed[scope] += 1
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
+
+
+def throttle_metrics() -> dict:
+    """Allowed/throttled request counts per URL name for this process."""
+    with _lock:
+        scopes = set(_allowed) | set(_throttled)
+        return {s: {"allowed": _allowed[s], "throttled": _throttled[s]} for s in sorted(scopes)}
@@ -0,0 +1,124 @@
+"""Account-to-account transfers.
+
+``transfer`` moves money immediately.  ``queue_transfer`` and
+``settle_pending_transfers`` batch many small transfers instead.  Settlement
+nets the transfers between each pair of accounts, so a hot merchant account
+gets one balance update and one pair of ledger entries per counterparty per
+batch, not one per payment.
+"""
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.utils import timezone
+
+from . import anomaly
+from .models import Account, IdempotencyKey, PendingTransfer, Transaction, lock_accounts
+from .partitions import find_entry
+
+
+def _validate(source: Account, target: Account, amount: Decimal) -> None:
+    if amount <= 0:
+        raise ValueError("Transfer amount must be positive.")
+    if source.pk == target.pk:
+        raise ValueError("Cannot transfer to the same account.")
+
+
+def _paired_entries(payer_id: int, payee_id: int, amount: Decimal, idempotency_key: str = None):
+    reference = uuid.uuid4()
+    return [
+        Transaction(account_id=payer_id, counterparty_id=payee_id, amount=amount, reference=reference,
+                    tx_type=Transaction.TRANSFER_OUT, idempotency_key=idempotency_key),
+        Transaction(account_id=payee_id, counterparty_id=payer_id, amount=amount, reference=reference,
+                    tx_type=Transaction.TRANSFER_IN),
+    ]
+
+
+def _replay(source: Account, target: Account, amount: Decimal, idempotency_key: str):
+    out = IdempotencyKey.recorded_entry(source, idempotency_key)
+    if out is None:
+        return None
+    if out.tx_type != Transaction.TRANSFER_OUT or out.amount != amount or out.counterparty_id != target.pk:
+        raise ValueError("Idempotency key was already used for a different request.")
+    return out, find_entry(reference=out.reference, tx_type=Transaction.TRANSFER_IN)
+
+
+def transfer(source: Account, target: Account, amount: Decimal, idempotency_key: str = None):
+    """Move ``amount`` from ``source`` to ``target`` and return the (out, in) ledger entries."""
+    _validate(source, target, amount)
+    if idempotency_key:
+        original = _replay(source, target, amount, idempotency_key)
+        if original is not None:
+            return original
+    try:
+        with db_transaction.atomic():
+            locked = lock_accounts(source.pk, target.pk)
+            payer, payee = locked[source.pk], locked[target.pk]
+            if amount > payer.balance:
+                raise ValueError("Insufficient balance.")
+            payer.balance -= amount
+            payee.balance += amount
+            Account.objects.bulk_update([payer, payee], ["balance"])
+            entries = Transaction.objects.bulk_create(
+                _paired_entries(payer.pk, payee.pk, amount, idempotency_key or None))
+            if idempotency_key:
+                IdempotencyKey.objects.create(account=payer, key=idempotency_key, transaction_id=entries[0].pk)
+            anomaly.schedule(entries)
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; ours was rolled back.
+        original = _replay(source, target, amount, idempotency_key) if idempotency_key else None
+        if original is None:
+            raise
+        return original
+    source.balance, target.balance = payer.balance, payee.balance
+    return entries[0], entries[1]
+
+
+def queue_transfer(source: Account, target: Account, amount: Decimal) -> PendingTransfer:
+    """Record a transfer for the next settlement batch; balances are not touched yet."""
+    _validate(source, target, amount)
+    return PendingTransfer.objects.create(source=source, target=target, amount=amount)
+
+
+def settle_pending_transfers(limit: int = 10000) -> dict:
+    """Settle up to ``limit`` pending transfers, oldest first, netted per account pair.
+
+    A pair whose net payer cannot cover the net amount is marked FAILED as a
+    whole; every other pair is applied.  Returns counts of settled/failed
+    transfers and ledger entries written.
+    """
+    with db_transaction.atomic():
+        pending = list(PendingTransfer.objects.select_for_update().filter(status=PendingTransfer.PENDING)[:limit])
+        if not pending:
+            return {"settled": 0, "failed": 0, "entries": 0}
+
+        # Net flow per unordered pair: positive means low id pays high id.
+        nets = defaultdict(Decimal)
+        members = defaultdict(list)
+        for item in pending:
+            low, high = sorted((item.source_id, item.target_id))
+            nets[(low, high)] += item.amount if item.source_id == low else -item.amount
+            members[(low, high)].append(item.pk)
+
+        locked = lock_accounts(*{account_id for pair in nets for account_id in pair})
+        entries, changed, settled, failed = [], {}, [], []
+        for (low, high), net in sorted(nets.items()):
+            payer, payee = (locked[low], locked[high]) if net >= 0 else (locked[high], locked[low])
+            net = abs(net)
+            if net > payer.balance:
+                failed.extend(members[(low, high)])
+                continue
+            if net:
+                payer.balance -= net
+                payee.balance += net
+                changed[payer.pk], changed[payee.pk] = payer, payee
+                entries.extend(_paired_entries(payer.pk, payee.pk, net))
+            settled.extend(members[(low, high)])
+
+        Account.objects.bulk_update(list(changed.values()), ["balance"])
+        anomaly.schedule(Transaction.objects.bulk_create(entries))
+        now = timezone.now()
+        PendingTransfer.objects.filter(pk__in=settled).update(status=PendingTransfer.SETTLED, settled_at=now)
+        PendingTransfer.objects.filter(pk__in=failed).update(status=PendingTransfer.FAILED, settled_at=now)
+    return {"settled": len(settled), "failed": len(failed), "entries": len(entries)}
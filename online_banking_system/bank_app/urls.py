@@ -1,5 +1,6 @@
 from django.urls import path
 from . import views
+from .throttling import throttle
 
 urlpatterns = [
     path("", views.index, name="index"),
@@ -7,8 +8,9 @@ urlpatterns = [
     path("login/", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
     path("dashboard/", views.dashboard, name="dashboard"),
-    path("deposit/", views.deposit, name="deposit"),
-    path("withdraw/", views.withdraw, name="withdraw"),
+    path("deposit/", throttle("10/m")(views.deposit), name="deposit"),
+    path("withdraw/", throttle("10/m")(views.withdraw), name="withdraw"),
+    path("transfer/", throttle("10/m")(views.transfer), name="transfer"),
     path("tools/", views.tools_menu, name="tools_menu"),
     path("tools/emi/", views.emi_tool, name="emi_tool"),
     path("tools/sip/", views.sip_tool, name="sip_tool"),
@@ -20,5 +22,9 @@ urlpatterns = [
     path("tools/taxable-income/", views.taxable_income_tool, name="taxable_income_tool"),
     path("tools/budget/", views.budget_tool, name="budget_tool"),
     path("tools/net-worth/", views.net_worth_tool, name="net_worth_tool"),
-    path("tools/loan-prediction/", views.loan_estimator, name="loan_estimator"),
+    path("tools/loan-prediction/", throttle("20/m")(views.loan_estimator), name="loan_estimator"),
+    path("ops/profiler/start/", views.profiler_start, name="profiler_start"),
+    path("ops/profiler/stop/", views.profiler_stop, name="profiler_stop"),
+    path("ops/profiler/", views.profiler_status, name="profiler_status"),
+    path("ops/profiler/download/", views.profiler_download, name="profiler_download"),
 ]
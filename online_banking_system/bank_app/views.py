@@ -1,3 +1,4 @@
+import uuid
 from decimal import Decimal
 from joblib import load
 import numpy as np
@@ -6,11 +7,17 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login as auth_login, authenticate, logout as auth_logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import require_POST
 from .forms import (
-    RegisterForm, DepositForm, WithdrawForm, SIPForm, FDForm, RDForm, RetirementForm,
+    RegisterForm, DepositForm, WithdrawForm, TransferForm, SIPForm, FDForm, RDForm, RetirementForm,
     HomeLoanEligibilityForm, CreditCardForm, TaxableIncomeForm, BudgetForm, NetWorthForm
 )
+from . import profiling
+from .conditional import static_page
 from .models import Account
+from .transfers import transfer as transfer_funds
 from finance_tools import (
     calculate_emi, calculate_sip, calculate_fd, calculate_rd, estimate_retirement_corpus,
     estimate_home_loan_eligibility, calculate_credit_card_balance, calculate_taxable_income,
@@ -58,6 +65,13 @@ def dashboard(request):
     transactions = account.transactions.all()[:10]
     return render(request, "bank_app/dashboard.html", {"account": account, "transactions": transactions})
 
+def _idempotency_key(request, form):
+    """Client retry key from the Idempotency-Key header, else the form's hidden field."""
+    key = request.headers.get("Idempotency-Key") or form.cleaned_data.get("idempotency_key")
+    if key and len(key) > 64:
+        raise ValueError("Idempotency key must be at most 64 characters.")
+    return key or None
+
 @login_required
 def deposit(request):
     account = get_object_or_404(Account, user=request.user)
@@ -65,10 +79,13 @@ def deposit(request):
         form = DepositForm(request.POST)
         if form.is_valid():
             amount = Decimal(form.cleaned_data["amount"])
-            account.deposit(amount)
-            return redirect("dashboard")
+            try:
+                account.deposit(amount, _idempotency_key(request, form))
+                return redirect("dashboard")
+            except ValueError as e:
+                form.add_error(None, str(e))
     else:
-        form = DepositForm()
+        form = DepositForm(initial={"idempotency_key": uuid.uuid4().hex})
     return render(request, "bank_app/deposit.html", {"form": form, "account": account})
 
 @login_required
@@ -79,20 +96,43 @@ def withdraw(request):
         if form.is_valid():
             amount = Decimal(form.cleaned_data["amount"])
             try:
-                account.withdraw(amount)
+                account.withdraw(amount, _idempotency_key(request, form))
                 return redirect("dashboard")
             except ValueError as e:
                 form.add_error(None, str(e))
     else:
-        form = WithdrawForm()
+        form = WithdrawForm(initial={"idempotency_key": uuid.uuid4().hex})
     return render(request, "bank_app/withdraw.html", {"form": form, "account": account})
 
+@login_required
+def transfer(request):
+    account = get_object_or_404(Account, user=request.user)
+    if request.method == "POST":
+        form = TransferForm(request.POST)
+        if form.is_valid():
+            try:
+                target = Account.objects.get(user__username=form.cleaned_data["recipient"])
+            except Account.DoesNotExist:
+                form.add_error("recipient", "No account with that username.")
+            else:
+                try:
+                    transfer_funds(account, target, Decimal(form.cleaned_data["amount"]),
+                                   _idempotency_key(request, form))
+                    return redirect("dashboard")
+                except ValueError as e:
+                    form.add_error(None, str(e))
+    else:
+        form = TransferForm(initial={"idempotency_key": uuid.uuid4().hex})
+    return render(request, "bank_app/transfer.html", {"form": form, "account": account})
+
 # Tools views
 @login_required
+@static_page("bank_app/tools_menu.html")
 def tools_menu(request):
     return render(request, "bank_app/tools_menu.html")
 
 @login_required
+@static_page("bank_app/emi_tool.html")
 def emi_tool(request):
     result = None
     errors = None
@@ -108,6 +148,7 @@ def emi_tool(request):
     return render(request, "bank_app/emi_tool.html", {"result": result, "errors": errors})
 
 @login_required
+@static_page("bank_app/sip_tool.html")
 def sip_tool(request):
     result = None
     form = SIPForm(request.GET or None)
@@ -118,6 +159,7 @@ def sip_tool(request):
     return render(request, "bank_app/sip_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/fd_tool.html")
 def fd_tool(request):
     result = None
     form = FDForm(request.GET or None)
@@ -129,6 +171,7 @@ def fd_tool(request):
     return render(request, "bank_app/fd_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/rd_tool.html")
 def rd_tool(request):
     result = None
     form = RDForm(request.GET or None)
@@ -139,6 +182,7 @@ def rd_tool(request):
     return render(request, "bank_app/rd_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/retirement_tool.html")
 def retirement_tool(request):
     result = None
     form = RetirementForm(request.GET or None)
@@ -150,6 +194,7 @@ def retirement_tool(request):
     return render(request, "bank_app/retirement_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/loan_eligibility_tool.html")
 def loan_eligibility_tool(request):
     result = None
     form = HomeLoanEligibilityForm(request.GET or None)
@@ -162,6 +207,7 @@ def loan_eligibility_tool(request):
     return render(request, "bank_app/loan_eligibility_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/credit_card_tool.html")
 def credit_card_tool(request):
     result = None
     form = CreditCardForm(request.GET or None)
@@ -173,6 +219,7 @@ def credit_card_tool(request):
     return render(request, "bank_app/credit_card_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/taxable_income_tool.html")
 def taxable_income_tool(request):
     result = None
     form = TaxableIncomeForm(request.GET or None)
@@ -184,6 +231,7 @@ def taxable_income_tool(request):
     return render(request, "bank_app/taxable_income_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/budget_tool.html")
 def budget_tool(request):
     result = None
     form = BudgetForm(request.GET or None)
@@ -192,6 +240,7 @@ def budget_tool(request):
     return render(request, "bank_app/budget_tool.html", {"form": form, "result": result})
 
 @login_required
+@static_page("bank_app/net_worth_tool.html")
 def net_worth_tool(request):
     result = None
     form = NetWorthForm(request.GET or None)
@@ -236,3 +285,45 @@ def loan_estimator(request):
         "predicted_amount": predicted_amount
     })
 
+# Profiler views (staff only; each acts on the worker process that serves it)
+@staff_member_required
+@require_POST
+def profiler_start(request):
+    try:
+        session = profiling.start(
+            request.POST.get("mode", profiling.SAMPLE),
+            int(request.POST.get("seconds", 30)),
+            request.POST.getlist("url_name"),
+            float(request.POST.get("rate", 1)),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(session.status(), status=201)
+
+@staff_member_required
+@require_POST
+def profiler_stop(request):
+    session = profiling.stop()
+    return JsonResponse(session.status() if session else {"active": False})
+
+@staff_member_required
+def profiler_status(request):
+    session = profiling.latest()
+    return JsonResponse(session.status() if session else {"active": False})
+
+@staff_member_required
+def profiler_download(request):
+    session = profiling.latest()
+    if session is None:
+        raise Http404("No profiling session has run in this process.")
+    if session.mode == profiling.SAMPLE:
+        response = HttpResponse(session.collapsed(), content_type="text/plain; charset=utf-8")
+        filename = "profile.collapsed"
+    else:
+        data = session.pstats_bytes()
+        if data is None:
+            raise Http404("No requests have been profiled yet.")
+        response = HttpResponse(data, content_type="application/octet-stream")
+        filename = "profile.pstats"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
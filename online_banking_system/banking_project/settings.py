@@ -29,27 +29,38 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so a profile covers the rest of the stack; one global check when idle.
+    "bank_app.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "bank_app.middleware.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
 ]
 
 ROOT_URLCONF = "banking_project.urls"
 
+_TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "bank_app" / "templates"],
-        "APP_DIRS": True,
-        "OPTIONS": {"context_processors": [
-            "django.template.context_processors.debug",
-            "django.template.context_processors.request",
-            "django.contrib.auth.context_processors.auth",
-            "django.contrib.messages.context_processors.messages",
-        ]},
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+            # Compiled templates stay in memory; under runserver the autoreloader
+            # resets this cache whenever a template file changes.
+            "loaders": [("django.template.loaders.cached.Loader", _TEMPLATE_LOADERS)],
+        },
     }
 ]
 
@@ -62,6 +73,64 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bank-default",
+    },
+    # Per-account anomaly state: one small entry per active account, never expired,
+    # so it must not share the default cache's 300-entry cull.  Use a shared backend
+    # (memcached/redis) with several workers so they score from the same state.
+    "anomaly": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bank-anomaly",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+    },
+}
+
+# Token-bucket limits are set per URL name in bank_app/urls.py.
+THROTTLE_ENABLED = True
+THROTTLE_CACHE = "default"
+
+# Auth performance profile (BANK_AUTH_PROFILE):
+#   "default" - DB sessions, every request loads the user row.
+#   "cached"  - cached_db sessions.
+#   "cookie"  - signed-cookie sessions (no session table).
+# Any profile can also cache user lookups: set BANK_AUTH_USER_CACHE_TIMEOUT (seconds)
+# and BANK_AUTH_USER_CACHE_LOCATION, a cache every worker shares (a redis:// URL by
+# default; set BANK_AUTH_USER_CACHE_BACKEND for memcached, file or database caches).
+# A per-process cache is refused at startup.  Deactivations made with
+# QuerySet.update() are only seen once the cached entry expires.
+AUTH_PROFILE = os.environ.get("BANK_AUTH_PROFILE", "default")
+SESSION_ENGINE = {
+    "default": "django.contrib.sessions.backends.db",
+    "cached": "django.contrib.sessions.backends.cached_db",
+    "cookie": "django.contrib.sessions.backends.signed_cookies",
+}[AUTH_PROFILE]
+AUTH_USER_CACHE = "default"
+if os.environ.get("BANK_AUTH_USER_CACHE_LOCATION"):
+    CACHES["users"] = {
+        "BACKEND": os.environ.get("BANK_AUTH_USER_CACHE_BACKEND", "django.core.cache.backends.redis.RedisCache"),
+        "LOCATION": os.environ["BANK_AUTH_USER_CACHE_LOCATION"],
+    }
+    AUTH_USER_CACHE = "users"
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("BANK_AUTH_USER_CACHE_TIMEOUT", "0"))
+
+# PBKDF2 work factor; None keeps Django's default. Changing it rehashes on next login.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("BANK_PBKDF2_ITERATIONS", "0")) or None
+PASSWORD_HASHERS = [
+    "bank_app.hashers.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# Streaming debit anomaly scoring (bank_app/anomaly.py); state lives in this cache.
+ANOMALY_ENABLED = True
+ANOMALY_CACHE = "anomaly"
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator", "OPTIONS": {"min_length": 8}},
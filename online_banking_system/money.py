@@ -0,0 +1,148 @@
+from decimal import Decimal, ROUND_HALF_EVEN, localcontext
+from functools import lru_cache
+from typing import Sequence, Union
+
+import numpy as np
+
+Number = Union[int, float, str, Decimal]
+
+PAISE = Decimal("0.01")
+_WORKING_PRECISION = 34
+
+
+def to_decimal(name: str, value: Number) -> Decimal:
+    """Convert a user-facing number to Decimal without binary float artefacts."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        raise TypeError(f"{name} must be a number (int, float, str or Decimal).")
+    try:
+        # str() of a float is its shortest round-trip repr, so 0.1 stays 0.1.
+        result = Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+    except ArithmeticError:
+        raise ValueError(f"{name} is not a valid amount.")
+    if not result.is_finite():
+        raise ValueError(f"{name} must be finite.")
+    if result < 0:
+        raise ValueError(f"{name} must be non-negative.")
+    return result
+
+
+def quantize(value: Decimal) -> Decimal:
+    """Round to whole paise using banker's rounding (ROUND_HALF_EVEN)."""
+    return Decimal(value).quantize(PAISE, rounding=ROUND_HALF_EVEN)
+
+
+def to_paise(value: Number) -> int:
+    """Integer paise for a rupee amount, rounded half-even."""
+    return int(quantize(to_decimal("value", value)) * 100)
+
+
+def from_paise(paise: int) -> Decimal:
+    """Rupee Decimal (two places) for an integer paise amount."""
+    if not isinstance(paise, int) or isinstance(paise, bool):
+        raise TypeError("paise must be an integer.")
+    return Decimal(paise).scaleb(-2)
+
+
+@lru_cache(maxsize=4096)
+def _growth_factor(rate_per_period: Decimal, periods: Decimal) -> Decimal:
+    """(1 + rate) ** periods at working precision, cached per rate/tenure pair."""
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        return (1 + rate_per_period) ** periods
+
+
+def _monthly_rate(annual_rate_percent: Decimal) -> Decimal:
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        return annual_rate_percent / 1200
+
+
+def _months(years: Decimal) -> int:
+    return int((years * 12).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def exact_emi(principal: Number, annual_rate_percent: Number, tenure_months: int) -> Decimal:
+    """Monthly EMI for a loan, in paise-exact Decimal."""
+    p = to_decimal("principal", principal)
+    rate = to_decimal("annual_rate_percent", annual_rate_percent)
+    if not isinstance(tenure_months, int) or tenure_months <= 0:
+        raise ValueError("tenure_months must be a positive integer.")
+    if rate == 0:
+        return quantize(p / tenure_months)
+    r = _monthly_rate(rate)
+    factor = _growth_factor(r, Decimal(tenure_months))
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        emi = p * r * factor / (factor - 1)
+    return quantize(emi)
+
+
+def exact_sip(monthly_investment: Number, annual_rate_percent: Number, years: Number) -> Decimal:
+    """SIP maturity amount (end-of-period contributions), in paise-exact Decimal."""
+    installment = to_decimal("monthly_investment", monthly_investment)
+    rate = to_decimal("annual_rate_percent", annual_rate_percent)
+    months = _months(to_decimal("years", years))
+    if months == 0:
+        return quantize(Decimal(0))
+    if rate == 0:
+        return quantize(installment * months)
+    r = _monthly_rate(rate)
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        maturity = installment * (_growth_factor(r, Decimal(months)) - 1) / r
+    return quantize(maturity)
+
+
+def exact_fd(principal: Number, annual_rate_percent: Number, years: Number,
+             compounding_per_year: int = 1) -> Decimal:
+    """Fixed deposit maturity with compounding, in paise-exact Decimal."""
+    p = to_decimal("principal", principal)
+    rate = to_decimal("annual_rate_percent", annual_rate_percent)
+    t = to_decimal("years", years)
+    if not isinstance(compounding_per_year, int) or compounding_per_year < 1:
+        raise ValueError("compounding_per_year must be integer >= 1.")
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        rate_per_period = rate / 100 / compounding_per_year
+        maturity = p * _growth_factor(rate_per_period, compounding_per_year * t)
+    return quantize(maturity)
+
+
+def exact_rd(monthly_deposit: Number, annual_rate_percent: Number, years: Number) -> Decimal:
+    """Recurring deposit maturity, in paise-exact Decimal.
+
+    Closed form of the monthly simulation in ``finance_tools.calculate_rd``
+    (deposits at the start of each month).
+    """
+    installment = to_decimal("monthly_deposit", monthly_deposit)
+    rate = to_decimal("annual_rate_percent", annual_rate_percent)
+    months = _months(to_decimal("years", years))
+    if months == 0:
+        return quantize(Decimal(0))
+    if rate == 0:
+        return quantize(installment * months)
+    r = _monthly_rate(rate)
+    with localcontext() as ctx:
+        ctx.prec = _WORKING_PRECISION
+        maturity = installment * (_growth_factor(r, Decimal(months)) - 1) / r * (1 + r)
+    return quantize(maturity)
+
+
+def estimate_emi_batch(principals: Sequence[float], annual_rate_percent: float,
+                       tenure_months: int) -> np.ndarray:
+    """Vectorised float EMI estimates for many principals at one rate/tenure.
+
+    For display only; amounts that post to the ledger must use ``exact_emi``.
+    """
+    p = np.asarray(principals, dtype=np.float64)
+    if np.any(p < 0):
+        raise ValueError("principals must be non-negative.")
+    if not isinstance(tenure_months, int) or tenure_months <= 0:
+        raise ValueError("tenure_months must be a positive integer.")
+    if annual_rate_percent < 0:
+        raise ValueError("annual_rate_percent must be non-negative.")
+    if annual_rate_percent == 0:
+        return p / tenure_months
+    r = annual_rate_percent / 100.0 / 12.0
+    factor = (1 + r) ** tenure_months
+    return p * (r * factor / (factor - 1))
@@ -0,0 +1,42 @@
+import unittest
+from decimal import Decimal
+
+from finance_tools import calculate_emi, calculate_fd, calculate_rd, calculate_sip
+from money import (
+    quantize, to_paise, from_paise, exact_emi, exact_sip, exact_fd, exact_rd,
+    estimate_emi_batch
+)
+
+
+class TestMoney(unittest.TestCase):
+    def test_bankers_rounding(self):
+        self.assertEqual(quantize(Decimal("2.345")), Decimal("2.34"))
+        self.assertEqual(quantize(Decimal("2.355")), Decimal("2.36"))
+
+    def test_paise_round_trip(self):
+        self.assertEqual(to_paise(0.1 + 0.2), 30)
+        self.assertEqual(to_paise("1250.505"), 125050)
+        self.assertEqual(from_paise(125050), Decimal("1250.50"))
+
+    def test_exact_matches_float_estimates(self):
+        self.assertAlmostEqual(float(exact_emi(100000, 10, 12)), calculate_emi(100000, 10, 12), places=2)
+        self.assertAlmostEqual(float(exact_sip(500, 12, 5)), calculate_sip(500, 12, 5), places=2)
+        self.assertAlmostEqual(float(exact_fd(10000, 5, 2, 4)), calculate_fd(10000, 5, 2, 4), places=2)
+        self.assertAlmostEqual(float(exact_rd(1000, 6, 1)), calculate_rd(1000, 6, 1), places=2)
+
+    def test_exact_zero_rate(self):
+        self.assertEqual(exact_emi(120000, 0, 12), Decimal("10000.00"))
+        self.assertEqual(exact_sip(Decimal("500"), 0, 2), Decimal("12000.00"))
+
+    def test_exact_rejects_negative(self):
+        with self.assertRaises(ValueError):
+            exact_emi(-1, 10, 12)
+
+    def test_emi_batch(self):
+        batch = estimate_emi_batch([100000, 200000], 10, 12)
+        self.assertAlmostEqual(batch[0], calculate_emi(100000, 10, 12), places=6)
+        self.assertAlmostEqual(batch[1], calculate_emi(200000, 10, 12), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()